@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Ad Copy Lint
+Offline checks for headlines, descriptions and final URLs, so obvious rejects
+are caught before anything is sent to the Google Ads API.
+
+Usage:
+    python ad_copy_lint.py manifest.json
+
+The manifest is a JSON list of creatives using the same field names as the
+validator: headline_1..3, description_1..2, business_name, final_url.
+"""
+
+import json
+import re
+import sys
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import accumulate
+from urllib.parse import urlsplit
+
+# ============================================================================
+# LIMITS
+# ============================================================================
+HEADLINE_MAX_WIDTH = 30
+DESCRIPTION_MAX_WIDTH = 90
+BUSINESS_NAME_MAX_WIDTH = 25
+
+MAX_WIDTHS = {
+    "headline": HEADLINE_MAX_WIDTH,
+    "description": DESCRIPTION_MAX_WIDTH,
+    "business_name": BUSINESS_NAME_MAX_WIDTH,
+}
+
+FIELD_KINDS = {
+    "headline_1": "headline",
+    "headline_2": "headline",
+    "headline_3": "headline",
+    "description_1": "description",
+    "description_2": "description",
+    "business_name": "business_name",
+}
+
+COPY_FIELDS = tuple(FIELD_KINDS)
+
+# All-caps words that are legitimate acronyms or brands, not shouting.
+ALLOWED_CAPS = frozenset({
+    "HTML", "HTTP", "HTTPS", "IKEA", "NASA", "NATO", "UNESCO", "UNICEF",
+    "ASAP", "FIFA", "IEEE", "JPEG", "NYSE", "NASDAQ", "AARP",
+})
+
+# Rules reported as warnings instead of errors. Warnings are printed but
+# don't stop a creative from being submitted, e.g. {"excessive_caps"}.
+WARNING_RULES = frozenset()
+
+
+# ============================================================================
+# PRECOMPILED RULES
+# ============================================================================
+
+Violation = namedtuple(
+    "Violation", ["index", "field", "rule", "message", "severity"],
+    defaults=("error",),
+)
+
+# CJK, Hangul and fullwidth forms count as two characters against the limits.
+_WIDE_CHAR = re.compile(
+    r"[\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff"
+    r"\ua000-\ua4cf\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60"
+    r"\uffe0-\uffe6\U00020000-\U0003fffd]"
+)
+
+# (rule, pattern, message, kinds the rule applies to or None for all).
+# Each rule is its own pattern starting with a plain char class: sre scans
+# those much faster than an alternation or a leading \b. None of them can
+# match across the newline that separates texts in a batch.
+_TEXT_RULES = [
+    ("repeated_punctuation", re.compile(r"[!?][!?]+"),
+     "Repeated punctuation '{match}'", None),
+    ("repeated_punctuation", re.compile(r"([.,;:])\1+"),
+     "Repeated punctuation '{match}'", None),
+    # Matches can start mid-word ("iPHONE"); those are dropped when linting.
+    ("excessive_caps", re.compile(r"[A-Z][A-Z][A-Z][A-Z]+\b"),
+     "Excessive capitalization '{match}'", None),
+    ("gimmicky_symbol", re.compile(
+        r"[\u2190-\u21ff\u2022\u25a0-\u27bf\u2b00-\u2bff\U0001f000-\U0001faff~^|<>{}\\]"),
+     "Gimmicky symbol '{match}'", None),
+    ("headline_exclamation", re.compile(r"!"),
+     "Headlines can't contain '!'", ("headline",)),
+]
+
+# Domains are found from a known TLD label, which is a fast literal search,
+# and then extended over the whole dotted host name in both directions, so
+# "example.co.uk" isn't cut short at ".co". The host's last label must be a
+# known TLD too, and the TLD must be all lowercase or all caps, so a missing
+# space after a sentence ("now.It's") isn't taken for a domain.
+_TLDS = frozenset(
+    "com net org io co biz info us uk ca de au nz ie in fr es it nl eu".split()
+)
+_TLD = re.compile(r"\.(?:" + "|".join(sorted(_TLDS)) + r")\b", re.IGNORECASE)
+_HOST_HEAD = re.compile(r"[a-z0-9.-]*$", re.IGNORECASE)
+_HOST_TAIL = re.compile(r"[a-z0-9.-]*", re.IGNORECASE)
+
+
+def text_width(text):
+    """Return the width of text as counted by Google Ads (wide chars count twice)."""
+    if text.isascii():
+        return len(text)
+    return len(text) + len(_WIDE_CHAR.findall(text))
+
+
+def domain_of(url):
+    """Return the lowercased host of a URL without a leading 'www.'."""
+    return _strip_www((urlsplit(url).hostname or "").lower())
+
+
+# Scheme and host of an http(s) URL, parsed in one regex match: urlsplit is
+# the slowest step of a manifest lint when every creative has its own URL.
+_HTTP_URL = re.compile(r"https?://(?:[^@/?#]*@)?([^:/?#]*)", re.IGNORECASE)
+
+
+def _strip_www(host):
+    return host[4:] if host.startswith("www.") else host
+
+
+def _domain_matches(domain, final_domain):
+    return domain == final_domain or domain.endswith("." + final_domain) \
+        or final_domain.endswith("." + domain)
+
+
+def lint_texts(kind, texts, allowed_caps=ALLOWED_CAPS):
+    """
+    Lint many pieces of ad copy of the same kind in one pass.
+    Returns (problems, domains) lists aligned with texts, where problems holds
+    (rule, message) pairs and domains the website domains mentioned in the text.
+    """
+    problems, domains = _lint_batch(kind, texts, allowed_caps)
+    return (
+        [problems.get(i, []) for i in range(len(texts))],
+        [domains.get(i, []) for i in range(len(texts))],
+    )
+
+
+def _lint_batch(kind, texts, allowed_caps):
+    """
+    Lint texts of one kind as a single string, so each rule is one regex scan
+    over the whole batch instead of one call per text. Returns (problems,
+    domains) dicts keyed by the index of each text that has any.
+    """
+    problems = {}
+    domains = {}
+    if not texts:
+        return problems, domains
+
+    blob = "\n".join(texts)
+    lengths = [len(text) for text in texts]
+    starts = [0, *accumulate(length + 1 for length in lengths)]
+
+    for i in [i for i, text in enumerate(texts) if not text or text.isspace()]:
+        problems[i] = [("empty", "Text is empty")]
+    max_width = MAX_WIDTHS.get(kind)
+    if max_width is not None:
+        # Only texts over half the limit can be too wide, even if all wide.
+        ascii_only = blob.isascii()
+        for i in [i for i, length in enumerate(lengths) if length * 2 > max_width]:
+            text = texts[i]
+            if text.isspace():
+                continue
+            width = len(text) if ascii_only else text_width(text)
+            if width > max_width:
+                problems.setdefault(i, []).append(
+                    ("too_long", f"{width} characters (max {max_width})")
+                )
+
+    for rule, pattern, message, kinds in _TEXT_RULES:
+        if kinds is not None and kind not in kinds:
+            continue
+        is_caps = rule == "excessive_caps"
+        search = pattern.search
+        match = search(blob)
+        while match is not None:
+            start = match.start()
+            if is_caps and (
+                (start and blob[start - 1].isalpha()) or match.group(0) in allowed_caps
+            ):
+                match = search(blob, match.end())
+                continue
+            i = bisect_right(starts, start) - 1
+            found = problems.setdefault(i, [])
+            if not found or found[-1][0] != rule:
+                found.append((rule, message.format(match=match.group(0))))
+            # Report each rule once per text, with its first offending match,
+            # so carry on from the next text.
+            match = search(blob, starts[i + 1])
+
+    host_end = -1
+    for match in _TLD.finditer(blob):
+        start = match.start()
+        if start < host_end:
+            # Another label of a host that was already extracted.
+            continue
+        i = bisect_right(starts, start) - 1
+        text_end = starts[i] + len(texts[i])
+        head = _HOST_HEAD.search(blob, starts[i], start).group(0)
+        tail = _HOST_TAIL.match(blob, start, text_end).group(0)
+        host_end = start + len(tail)
+        host = (head + tail).strip(".-")
+        tld = host.rsplit(".", 1)[-1]
+        if (
+            not any(c.isalpha() for c in head)
+            or tld.lower() not in _TLDS
+            or not (tld.islower() or tld.isupper())
+            or not (match.group(0).islower() or match.group(0).isupper())
+        ):
+            continue
+        domains.setdefault(i, []).append(_strip_www(host.lower()))
+
+    return problems, domains
+
+
+def lint_text(kind, text, allowed_caps=ALLOWED_CAPS):
+    """Lint a single piece of ad copy. Returns a list of (rule, message) pairs."""
+    problems, _ = lint_texts(kind, [text], allowed_caps)
+    return problems[0]
+
+
+def _check_final_url(final_url, expected_domain):
+    """Return (domain or None, list of (rule, message)) for a final URL."""
+    match = _HTTP_URL.match(final_url)
+    final_domain = _strip_www(match.group(1).lower()) if match else None
+    if not final_domain:
+        return None, [("invalid_url", f"Not a valid http(s) URL: '{final_url}'")]
+    if expected_domain and not _domain_matches(final_domain, expected_domain.lower()):
+        return final_domain, [(
+            "domain_mismatch",
+            f"Final URL domain '{final_domain}' doesn't match '{expected_domain}'"
+        )]
+    return final_domain, []
+
+
+class _NonText:
+    """Hashable stand-in for an unhashable non-text field value."""
+
+    def __init__(self, value):
+        self.type_name = type(value).__name__
+
+
+def lint_manifest(creatives, expected_domain=None, allowed_caps=ALLOWED_CAPS,
+                  warning_rules=WARNING_RULES):
+    """
+    Lint the copy and final URL of every creative in a manifest (a list of
+    dicts keyed by field name). Each distinct text and URL is checked once.
+    Returns a list of Violations, ordered by creative; rules in warning_rules
+    get severity "warning", everything else "error".
+    """
+    final_urls = [creative.get("final_url") for creative in creatives]
+    final_urls = [
+        url if isinstance(url, str) else "" if url is None else str(url)
+        for url in final_urls
+    ]
+    columns = {
+        field: [creative.get(field) for creative in creatives]
+        for field in COPY_FIELDS
+    }
+
+    # Lint the distinct texts of each kind as a single batch, keeping only
+    # the texts that have something to report. Non-text values (missing
+    # fields, numbers, ...) are kept too, mapped to None.
+    flagged = {}
+    for kind in MAX_WIDTHS:
+        distinct = {}
+        for field, kind_of_field in FIELD_KINDS.items():
+            if kind_of_field != kind:
+                continue
+            try:
+                distinct.update(dict.fromkeys(columns[field]))
+            except TypeError:
+                # Unhashable values (lists, dicts) stand in as their type.
+                columns[field] = [
+                    value if value is None or isinstance(value, str) else _NonText(value)
+                    for value in columns[field]
+                ]
+                distinct.update(dict.fromkeys(columns[field]))
+        texts = [value for value in distinct if isinstance(value, str)]
+        problems, domains = _lint_batch(kind, texts, allowed_caps)
+        hits = {
+            texts[i]: (problems.get(i, ()), domains.get(i, ()))
+            for i in problems.keys() | domains.keys()
+        }
+        if len(texts) < len(distinct):
+            hits.update((value, None) for value in distinct if not isinstance(value, str))
+        flagged[kind] = hits
+
+    urls = {url: _check_final_url(url, expected_domain) for url in set(final_urls)}
+
+    # Violations are built straight from tuples: tens of thousands of
+    # namedtuple() calls are a noticeable part of linting a large manifest.
+    violations = []
+    append = violations.append
+    make = tuple.__new__
+    severity = {rule: "warning" for rule in warning_rules}
+
+    for index, final_url in enumerate(final_urls):
+        for rule, message in urls[final_url][1]:
+            append(make(Violation, (
+                index, "final_url", rule, message, severity.get(rule, "error")
+            )))
+
+    for field in COPY_FIELDS:
+        hits = flagged[FIELD_KINDS[field]]
+        column = columns[field]
+        for index in [index for index, value in enumerate(column) if value in hits]:
+            value = column[index]
+            result = hits[value]
+            if result is None:
+                if value is None:
+                    rule, message = "missing", "Field is missing"
+                else:
+                    type_name = getattr(value, "type_name", type(value).__name__)
+                    rule, message = "invalid_type", f"Expected text, got {type_name}"
+                append(make(Violation, (
+                    index, field, rule, message, severity.get(rule, "error")
+                )))
+                continue
+            problems, domains = result
+            for rule, message in problems:
+                append(make(Violation, (
+                    index, field, rule, message, severity.get(rule, "error")
+                )))
+            final_domain = urls[final_urls[index]][0]
+            if final_domain is None:
+                continue
+            for mentioned in domains:
+                if not _domain_matches(mentioned, final_domain):
+                    append(make(Violation, (
+                        index, field, "domain_mismatch",
+                        f"Mentions '{mentioned}' but final URL is on '{final_domain}'",
+                        severity.get("domain_mismatch", "error"),
+                    )))
+
+    violations.sort(key=lambda v: v.index)
+    return violations
+
+
+def lint_creative(creative, expected_domain=None, allowed_caps=ALLOWED_CAPS,
+                  warning_rules=WARNING_RULES):
+    """
+    Lint a single creative. Returns a list of Violations.
+
+    >>> copy = {"headline_1": "Big sale", "headline_2": "New range",
+    ...         "headline_3": "Shop now", "description_1": "Visit example.co.uk.",
+    ...         "description_2": "Or example.com.au", "business_name": "Example"}
+    >>> lint_creative(dict(copy, final_url="https://www.example.co.uk"))
+    [Violation(index=0, field='description_2', rule='domain_mismatch', message="Mentions 'example.com.au' but final URL is on 'example.co.uk'", severity='error')]
+    >>> lint_creative(dict(copy, description_2="Shop example.co.uk",
+    ...                    final_url="https://example.co.uk/sale"))
+    []
+    >>> [v.rule for v in lint_creative({"headline_1": 123, "final_url": "https://example.com"})]
+    ['invalid_type', 'missing', 'missing', 'missing', 'missing', 'missing']
+    >>> lint_creative(dict(copy, headline_1="iPHONE deals", headline_2="IKEA and NASA",
+    ...                    description_2="Shop now.It's great", final_url="https://example.co.uk"))
+    []
+    >>> lint_creative(dict(copy, headline_1="HUGE sale", description_2="Shop now",
+    ...                    final_url="https://example.co.uk"),
+    ...               warning_rules={"excessive_caps"})
+    [Violation(index=0, field='headline_1', rule='excessive_caps', message="Excessive capitalization 'HUGE'", severity='warning')]
+    """
+    return lint_manifest([creative], expected_domain, allowed_caps, warning_rules)
+
+
+def errors_only(violations):
+    """Return the violations that block submission (severity "error")."""
+    return [v for v in violations if v.severity == "error"]
+
+
+def format_violations(violations, show_index=True):
+    """Format violations as one line per field, for printing or error messages."""
+    return "\n".join(
+        (f"- [{v.index}] " if show_index else "- ")
+        + f"{v.field}: {v.message} ({v.rule}"
+        + (", warning)" if v.severity == "warning" else ")")
+        for v in violations
+    )
+
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python ad_copy_lint.py manifest.json [expected_domain]")
+        return 2
+
+    with open(argv[0], encoding="utf-8") as manifest_file:
+        creatives = json.load(manifest_file)
+    expected_domain = argv[1] if len(argv) > 1 else None
+
+    violations = lint_manifest(creatives, expected_domain)
+    if not violations:
+        print(f"✓ {len(creatives)} creatives passed ad copy lint")
+        return 0
+
+    errors = errors_only(violations)
+    print(f"{'✗' if errors else '⚠️ '} {len(errors)} errors and "
+          f"{len(violations) - len(errors)} warnings in {len(creatives)} creatives:")
+    print(format_violations(violations))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    exit(main())
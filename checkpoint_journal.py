@@ -0,0 +1,174 @@
+"""
+Checkpoint Journal
+Append-only, fsync'd record of each creative's progress through a validation
+run, so an interrupted run can resume without re-uploading anything.
+
+Each line is a JSON record {"key": ..., "stage": ..., <fields>}. Stages are
+recorded in order: prechecked, asset_created (asset_resource_name),
+ad_created (ad_resource_name) and verdict (verdict, error). Replaying the
+journal merges the records per key into the creative's current state.
+"""
+
+import hashlib
+import json
+import os
+
+STAGES = ("prechecked", "asset_created", "ad_created", "verdict")
+
+# Rewrite the journal once this many records have been appended since the
+# last compaction, and it holds at least twice as many lines as creatives.
+COMPACT_EVERY = 10000
+
+
+def creative_key(creative):
+    """Stable key for a creative: its 'id' if given, else a hash of its fields."""
+    if creative.get("id") is not None:
+        return str(creative["id"])
+    encoded = json.dumps(creative, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class CheckpointJournal:
+    """
+    Journal of creative progress, kept in memory as {key: state} and on disk
+    as an append-only JSON lines file. Every record is flushed and fsync'd
+    before record() or record_many() returns.
+
+    keys are the creatives of the current run; state for any other key (e.g.
+    a manifest entry that has since been edited) is dropped. Without resume,
+    an existing journal is discarded unless a creative of this run has
+    uploads but no verdict yet, since that progress would be lost.
+    """
+
+    def __init__(self, path, keys=None, resume=False, fresh=False,
+                 compact_every=COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self._states = {}
+        self._file = None
+        self._lines = 0
+        self._appended = 0
+
+        if os.path.exists(path) and not fresh:
+            self._replay()
+            if keys is not None:
+                self._states = {
+                    key: self._states[key] for key in keys if key in self._states
+                }
+            if not resume:
+                # A creative that was only prechecked has nothing uploaded yet.
+                unfinished = sum(1 for state in self._states.values()
+                                 if state["stage"] in ("asset_created", "ad_created"))
+                if unfinished:
+                    raise FileExistsError(
+                        f"{path} has {unfinished} creatives with uploads but no "
+                        "verdict; use --resume to continue or --fresh to discard it"
+                    )
+                self._states = {}
+        # Start from a compact file, which also drops a torn last line.
+        self._write_snapshot()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self):
+        with open(self.path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves at most one partial line.
+                    continue
+                self._apply(record)
+
+    def _apply(self, record):
+        record = dict(record)
+        key = record.pop("key")
+        stage = record.pop("stage")
+        state = self._states.setdefault(key, {})
+        state.update(record)
+        if STAGES.index(stage) >= STAGES.index(state.get("stage", stage)):
+            state["stage"] = stage
+
+    def state(self, key):
+        """Return the merged state of a creative ({} if never seen)."""
+        return self._states.get(key, {})
+
+    def reached(self, key, stage):
+        """True if the creative has already been through the given stage."""
+        current = self.state(key).get("stage")
+        return current is not None and STAGES.index(current) >= STAGES.index(stage)
+
+    def record(self, key, stage, **fields):
+        """Durably append a stage record for a creative."""
+        record = {"key": key, "stage": stage}
+        record.update(fields)
+        self.record_many([record])
+
+    def record_many(self, records):
+        """
+        Durably append many {"key": ..., "stage": ..., <fields>} records with
+        a single fsync, e.g. the pre-check results of a whole manifest.
+        """
+        records = list(records)
+        for record in records:
+            if record["stage"] not in STAGES:
+                raise ValueError(f"Unknown stage '{record['stage']}'")
+        self._file.write("".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        for record in records:
+            self._apply(record)
+        self._lines += len(records)
+        self._appended += len(records)
+
+        if self._appended >= self.compact_every and self._lines >= 2 * len(self._states):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal as one record per creative, atomically."""
+        if self._file is not None:
+            self._file.close()
+        self._write_snapshot()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _write_snapshot(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+            for key, state in self._states.items():
+                record = {"key": key}
+                record.update(state)
+                tmp_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path)
+        self._lines = len(self._states)
+        self._appended = 0
+
+    def summary(self):
+        """Count creatives per furthest stage reached."""
+        counts = {}
+        for state in self._states.values():
+            counts[state["stage"]] = counts.get(state["stage"], 0) + 1
+        return counts
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _fsync_dir(path):
+    """fsync the directory holding path so a rename survives a crash."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
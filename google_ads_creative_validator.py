@@ -4,10 +4,16 @@ Google Ads Creative Validator
 Uploads a creative to a specific campaign as a PAUSED ad to validate against Google's policies.
 """
 
+import argparse
+import json
 import os
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 
+from ad_copy_lint import errors_only, format_violations, lint_creative, lint_manifest
+from checkpoint_journal import CheckpointJournal, creative_key
+from grpc_transport import TransportClient, TransportConfig
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -27,6 +33,24 @@ DESCRIPTION_2 = "Another description for your ad."
 BUSINESS_NAME = "Your Business"
 FINAL_URL = "https://www.example.com"  # UPDATE THIS
 
+# Batch run (optional): JSON list of creatives with image_path, headline_1..3,
+# description_1..2, business_name, final_url and an optional id.
+# When None, the single creative above is validated.
+MANIFEST_PATH = None
+
+# Checkpoint journal: an interrupted run continues where it stopped with --resume
+JOURNAL_PATH = "validator_journal.jsonl"
+
+# API errors that stop the run (to retry with --resume) instead of failing the creative
+TRANSIENT_STATUS_CODES = {"RESOURCE_EXHAUSTED", "INTERNAL", "UNAVAILABLE", "DEADLINE_EXCEEDED", "ABORTED"}
+TRANSIENT_ERROR_CODES = {"quota_error", "internal_error", "database_error"}
+
+# gRPC transport (run `python grpc_transport.py --benchmark` to compare options)
+SHARE_CHANNEL = True          # One long-lived channel for all services
+KEEPALIVE_TIME_MS = 60000     # Keepalive ping interval, 0 to disable
+REQUEST_TIMEOUT = 120         # Per-call deadline in seconds, None for no deadline
+COMPRESSION = None            # "gzip" to compress requests of 64 KB or more
+
 
 # ============================================================================
 # MAIN FUNCTIONS
@@ -35,7 +59,13 @@ FINAL_URL = "https://www.example.com"  # UPDATE THIS
 def initialize_client():
     """Initialize Google Ads API client from google-ads.yaml"""
     try:
-        client = GoogleAdsClient.load_from_storage()
+        transport = TransportConfig(
+            share_channel=SHARE_CHANNEL,
+            keepalive_time_ms=KEEPALIVE_TIME_MS,
+            timeout=REQUEST_TIMEOUT,
+            compression=COMPRESSION,
+        )
+        client = TransportClient(GoogleAdsClient.load_from_storage(), transport)
         print("✓ Google Ads API client initialized")
         return client
     except Exception as e:
@@ -129,8 +159,8 @@ def upload_image_asset(client, customer_id, image_path):
     try:
         with open(image_path, "rb") as image_file:
             image_data = image_file.read()
-    except FileNotFoundError:
-        print(f"✗ Error: Image file not found at {image_path}")
+    except OSError as e:
+        print(f"✗ Error: Can't read image file {image_path}: {e.strerror or e}")
         raise
     
     # Create asset operation
@@ -157,6 +187,35 @@ def upload_image_asset(client, customer_id, image_path):
         raise
 
 
+def check_ad_copy(
+    headline_1,
+    headline_2,
+    headline_3,
+    description_1,
+    description_2,
+    business_name,
+    final_url
+):
+    """Lint the ad copy offline, print warnings and raise ValueError on errors."""
+    violations = lint_creative({
+        "headline_1": headline_1,
+        "headline_2": headline_2,
+        "headline_3": headline_3,
+        "description_1": description_1,
+        "description_2": description_2,
+        "business_name": business_name,
+        "final_url": final_url,
+    })
+    errors = errors_only(violations)
+    if errors:
+        print("\n✗ Ad copy failed lint:")
+        print(format_violations(violations, show_index=False))
+        raise ValueError(f"Ad copy failed lint ({len(errors)} errors)")
+    if violations:
+        print("\n⚠️  Ad copy lint warnings:")
+        print(format_violations(violations, show_index=False))
+
+
 def create_paused_responsive_display_ad(
     client, 
     customer_id, 
@@ -171,6 +230,15 @@ def create_paused_responsive_display_ad(
     final_url
 ):
     """Create a ResponsiveDisplayAd with PAUSED status."""
+    check_ad_copy(
+        headline_1,
+        headline_2,
+        headline_3,
+        description_1,
+        description_2,
+        business_name,
+        final_url
+    )
     ad_group_ad_service = client.get_service("AdGroupAdService")
     
     print(f"\n🎨 Creating PAUSED Responsive Display Ad...")
@@ -233,54 +301,244 @@ def create_ad_text_asset(client, text):
     return ad_text_asset
 
 
+def load_creatives():
+    """
+    Load the creatives to validate, MANIFEST_PATH or the single creative above,
+    as (key, creative) pairs. Raises ValueError if the manifest isn't a list of
+    objects or two creatives share a key.
+    """
+    if MANIFEST_PATH:
+        with open(MANIFEST_PATH, encoding="utf-8") as manifest_file:
+            creatives = json.load(manifest_file)
+        if not isinstance(creatives, list):
+            raise ValueError(f"{MANIFEST_PATH} must hold a JSON list of creatives")
+    else:
+        creatives = [{
+            "image_path": IMAGE_PATH,
+            "headline_1": HEADLINE_1,
+            "headline_2": HEADLINE_2,
+            "headline_3": HEADLINE_3,
+            "description_1": DESCRIPTION_1,
+            "description_2": DESCRIPTION_2,
+            "business_name": BUSINESS_NAME,
+            "final_url": FINAL_URL,
+        }]
+    
+    pairs = []
+    seen = {}
+    for index, creative in enumerate(creatives):
+        if not isinstance(creative, dict):
+            raise ValueError(
+                f"{MANIFEST_PATH} entry {index} is not an object: {creative!r:.60}"
+            )
+        key = creative_key(creative)
+        if key in seen:
+            raise ValueError(
+                f"{MANIFEST_PATH} entries {seen[key]} and {index} have the same "
+                f"{'id' if creative.get('id') is not None else 'fields'} ({key}); "
+                "give each creative a unique id"
+            )
+        seen[key] = index
+        pairs.append((key, creative))
+    return pairs
+
+
+def precheck_creatives(journal, pending):
+    """
+    Lint the ad copy of every pending (key, creative) in one pass and record
+    the results with a single fsync: a failed or lint_failed verdict, or the
+    prechecked stage.
+    """
+    unchecked = [
+        (key, creative) for key, creative in pending
+        if not journal.reached(key, "prechecked")
+    ]
+    if not unchecked:
+        return
+    
+    violations = {}
+    for violation in lint_manifest([creative for _, creative in unchecked]):
+        violations.setdefault(violation.index, []).append(violation)
+    
+    records = []
+    for index, (key, creative) in enumerate(unchecked):
+        image_path = creative.get("image_path")
+        if not isinstance(image_path, str) or not image_path:
+            print(f"\n✗ Creative {key} has no image_path")
+            records.append({"key": key, "stage": "verdict",
+                            "verdict": "failed", "error": "Missing image_path"})
+        elif errors_only(violations.get(index, [])):
+            error = format_violations(violations[index], show_index=False)
+            print(f"\n✗ Creative {key} ad copy failed lint:\n{error}")
+            records.append({"key": key, "stage": "verdict",
+                            "verdict": "lint_failed", "error": error})
+        else:
+            records.append({"key": key, "stage": "prechecked"})
+    journal.record_many(records)
+    
+    passed = sum(1 for key, _ in unchecked if not journal.reached(key, "verdict"))
+    print(f"✓ {passed} of {len(unchecked)} creatives passed pre-checks")
+
+
+def is_transient_error(ex):
+    """True if a GoogleAdsException is worth retrying later (quota, internal, unavailable)."""
+    code = ex.error.code() if ex.error is not None else None
+    if code is not None and code.name in TRANSIENT_STATUS_CODES:
+        return True
+    for error in ex.failure.errors:
+        error_code = error.error_code
+        if not hasattr(error_code, "WhichOneof"):
+            error_code = type(error_code).pb(error_code)
+        if error_code.WhichOneof("error_code") in TRANSIENT_ERROR_CODES:
+            return True
+    return False
+
+
+def validate_creative(client, journal, key, creative, ad_group_resource_name):
+    """
+    Upload one creative's image and create its paused ad, skipping any stage
+    the journal shows was already done. API errors and unreadable images are
+    recorded as a failed verdict; transient API errors (quota, internal) and
+    anything else (auth, network, Ctrl-C) stop the run so it can be resumed.
+    """
+    state = journal.state(key)
+    
+    try:
+        # Step 2: Upload image asset
+        if journal.reached(key, "asset_created"):
+            image_asset_resource_name = state["asset_resource_name"]
+            print(f"\n↷ Reusing uploaded image: {image_asset_resource_name}")
+        else:
+            image_asset_resource_name = upload_image_asset(
+                client, CUSTOMER_ID, creative["image_path"]
+            )
+            journal.record(
+                key, "asset_created", asset_resource_name=image_asset_resource_name
+            )
+        
+        # Step 3: Create paused responsive display ad
+        if journal.reached(key, "ad_created"):
+            ad_resource_name = state["ad_resource_name"]
+            print(f"↷ Reusing created ad: {ad_resource_name}")
+        else:
+            ad_resource_name = create_paused_responsive_display_ad(
+                client,
+                CUSTOMER_ID,
+                ad_group_resource_name,
+                image_asset_resource_name,
+                creative["headline_1"],
+                creative["headline_2"],
+                creative["headline_3"],
+                creative["description_1"],
+                creative["description_2"],
+                creative["business_name"],
+                creative["final_url"]
+            )
+            journal.record(key, "ad_created", ad_resource_name=ad_resource_name)
+        
+    except GoogleAdsException as ex:
+        error = "; ".join(error.message for error in ex.failure.errors)
+        if is_transient_error(ex):
+            print(f"\n✗ Transient API error, stopping so --resume can retry: {error or ex.error}")
+            raise
+        journal.record(key, "verdict", verdict="failed", error=error)
+        return
+    except (OSError, KeyError, ValueError) as e:
+        journal.record(key, "verdict", verdict="failed", error=str(e))
+        return
+    
+    journal.record(key, "verdict", verdict="submitted")
+
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Google Ads Creative Validator")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue an interrupted run from the checkpoint journal"
+    )
+    parser.add_argument(
+        "--fresh", action="store_true",
+        help="discard an existing journal that still has unfinished creatives"
+    )
+    parser.add_argument(
+        "--journal", default=JOURNAL_PATH,
+        help=f"checkpoint journal path (default: {JOURNAL_PATH})"
+    )
+    args = parser.parse_args(argv)
+    
     print("=" * 70)
     print("GOOGLE ADS CREATIVE VALIDATOR")
     print("=" * 70)
     print(f"Customer ID: {CUSTOMER_ID}")
     print(f"Campaign ID: {CAMPAIGN_ID}")
     print(f"Ad Group Name: {AD_GROUP_NAME}")
+    print(f"Journal: {args.journal}{' (resuming)' if args.resume else ''}")
     print("=" * 70)
     
     try:
-        # Initialize client
-        client = initialize_client()
+        creatives = load_creatives()
+        keys = [key for key, _ in creatives]
         
-        # Step 1: Find or create ad group
-        ad_group_resource_name, ad_group_id = find_or_create_ad_group(
-            client, CUSTOMER_ID, CAMPAIGN_ID, AD_GROUP_NAME
-        )
+        with CheckpointJournal(
+            args.journal, keys=keys, resume=args.resume, fresh=args.fresh
+        ) as journal:
+            remaining = [
+                (key, creative) for key, creative in creatives
+                if not journal.reached(key, "verdict")
+            ]
+            if args.resume:
+                print(f"↷ {len(creatives) - len(remaining)} of {len(creatives)} "
+                      "creatives already finished, skipping them")
+            
+            # Step 0: Lint ad copy offline before anything hits the network
+            precheck_creatives(journal, remaining)
+            remaining = [
+                (key, creative) for key, creative in remaining
+                if not journal.reached(key, "verdict")
+            ]
+            
+            ad_group_id = None
+            if remaining:
+                # Initialize client
+                client = initialize_client()
+                
+                # Step 1: Find or create ad group
+                ad_group_resource_name, ad_group_id = find_or_create_ad_group(
+                    client, CUSTOMER_ID, CAMPAIGN_ID, AD_GROUP_NAME
+                )
+                
+                # Steps 2-3: Upload image asset and create paused ad, per creative
+                for key, creative in remaining:
+                    validate_creative(
+                        client, journal, key, creative, ad_group_resource_name
+                    )
+            
+            results = [journal.state(key) for key in keys]
         
-        # Step 2: Upload image asset
-        image_asset_resource_name = upload_image_asset(
-            client, CUSTOMER_ID, IMAGE_PATH
-        )
-        
-        # Step 3: Create paused responsive display ad
-        ad_resource_name = create_paused_responsive_display_ad(
-            client,
-            CUSTOMER_ID,
-            ad_group_resource_name,
-            image_asset_resource_name,
-            HEADLINE_1,
-            HEADLINE_2,
-            HEADLINE_3,
-            DESCRIPTION_1,
-            DESCRIPTION_2,
-            BUSINESS_NAME,
-            FINAL_URL
-        )
+        submitted = [state for state in results if state.get("verdict") == "submitted"]
+        failed = [state for state in results if state.get("verdict") != "submitted"]
         
         # Success output
         print("\n" + "=" * 70)
-        print("✅ SUCCESS - Creative uploaded for validation")
+        if failed:
+            print(f"⚠️  {len(submitted)} of {len(results)} creatives uploaded for validation")
+        else:
+            print("✅ SUCCESS - Creative uploaded for validation")
         print("=" * 70)
-        print(f"📊 Ad Group ID: {ad_group_id}")
-        print(f"🎯 Ad Resource Name: {ad_resource_name}")
+        if ad_group_id:
+            print(f"📊 Ad Group ID: {ad_group_id}")
+        for state in submitted[:10]:
+            print(f"🎯 Ad Resource Name: {state['ad_resource_name']}")
+        if len(submitted) > 10:
+            print(f"   ... and {len(submitted) - 10} more (see {args.journal})")
+        for state in failed[:10]:
+            print(f"❌ {state.get('verdict')}: {state.get('error')}")
+        if len(failed) > 10:
+            print(f"   ... and {len(failed) - 10} more (see {args.journal})")
         print("\n📋 NEXT STEPS:")
         print(f"1. Go to: https://ads.google.com/aw/ads?campaignId={CAMPAIGN_ID}")
         print("2. Click 'Ads' in the left menu")
@@ -290,14 +548,23 @@ def main():
         print("   ❌ 'Disapproved' = Your creative FAILED (hover to see reason)")
         print("=" * 70)
         
+    except KeyboardInterrupt:
+        print("\n" + "=" * 70)
+        print("⏸  INTERRUPTED")
+        print("=" * 70)
+        print(f"Progress is saved in {args.journal}; rerun with --resume to continue.")
+        return 130
+    
     except Exception as e:
         print("\n" + "=" * 70)
         print("❌ SCRIPT FAILED")
         print("=" * 70)
         print(f"Error: {e}")
+        if os.path.exists(args.journal):
+            print(f"Progress is saved in {args.journal}; rerun with --resume to continue.")
         return 1
     
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
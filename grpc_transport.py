@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+gRPC Transport
+Transport settings for the Google Ads API client: a shared long-lived channel,
+keepalive, per-call deadlines and gzip compression for large requests.
+
+Usage:
+    python grpc_transport.py --benchmark [path/to/image.jpg] [calls]
+
+The benchmark sends image-sized requests to a local gRPC stand-in server and
+compares bytes on the wire and latency for each transport option.
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent import futures
+
+import grpc
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TransportConfig = namedtuple(
+    "TransportConfig",
+    [
+        "share_channel",          # one channel for every service
+        "keepalive_time_ms",      # ping interval on idle connections, 0 = off
+        "keepalive_timeout_ms",   # how long to wait for a ping ack
+        "timeout",                # per-call deadline in seconds, None = no deadline
+        "compression",            # "gzip" or None
+        "compression_threshold",  # only compress requests at least this big (bytes)
+    ],
+    defaults=(True, 60000, 20000, 120.0, None, 64 * 1024),
+)
+
+# Shared channel and keepalive on; images are usually JPEG/PNG, which gzip
+# barely shrinks, so compression is opt-in (see the benchmark).
+DEFAULT_TRANSPORT = TransportConfig()
+
+# What GoogleAdsClient does on its own: a new channel per get_service() call,
+# no keepalive, no deadline and no compression.
+LIBRARY_TRANSPORT = TransportConfig(
+    share_channel=False, keepalive_time_ms=0, timeout=None, compression=None
+)
+
+# Serializes the channel factory swap in TransportClient._create_service, so
+# clients in different threads (e.g. Streamlit sessions) never see each
+# other's factory or shared channel.
+_CHANNEL_FACTORY_LOCK = threading.Lock()
+
+_COMPRESSION = {
+    None: grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+}
+
+
+def channel_options(config, base_options=()):
+    """
+    Return the gRPC channel options for a TransportConfig, added to
+    base_options (e.g. the message size limits GoogleAdsClient sets).
+    """
+    options = list(base_options)
+    if config.keepalive_time_ms:
+        options += [
+            ("grpc.keepalive_time_ms", config.keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", config.keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ]
+    return options
+
+
+# ============================================================================
+# INTERCEPTOR
+# ============================================================================
+
+class _CallDetails(
+    namedtuple(
+        "_CallDetails",
+        ["method", "timeout", "metadata", "credentials", "wait_for_ready", "compression"],
+    ),
+    grpc.ClientCallDetails,
+):
+    pass
+
+
+def _request_size(request):
+    """Serialized size of a request: raw bytes, protobuf or proto-plus message."""
+    if isinstance(request, (bytes, bytearray)):
+        return len(request)
+    if hasattr(request, "ByteSize"):
+        return request.ByteSize()
+    return type(request).pb(request).ByteSize()
+
+
+class TransportInterceptor(
+    grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor
+):
+    """Applies the per-call deadline and compression of a TransportConfig."""
+
+    def __init__(self, config):
+        self._config = config
+        self._compression = _COMPRESSION[config.compression]
+
+    def _details(self, details, request):
+        timeout = details.timeout
+        if timeout is None:
+            timeout = self._config.timeout
+
+        compression = getattr(details, "compression", None)
+        if (
+            compression is None
+            and self._config.compression
+            and _request_size(request) >= self._config.compression_threshold
+        ):
+            compression = self._compression
+
+        return _CallDetails(
+            details.method,
+            timeout,
+            details.metadata,
+            details.credentials,
+            getattr(details, "wait_for_ready", None),
+            compression,
+        )
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return continuation(self._details(client_call_details, request), request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return continuation(self._details(client_call_details, request), request)
+
+
+# ============================================================================
+# CLIENT WRAPPER
+# ============================================================================
+
+class TransportClient:
+    """
+    Wraps a GoogleAdsClient so every service shares the transport settings.
+    Service clients are created once per name and reused; with share_channel
+    they all run on a single channel. Anything else (get_type, enums, ...) is
+    forwarded to the wrapped client.
+    """
+
+    def __init__(self, client, config=DEFAULT_TRANSPORT):
+        self._client = client
+        self.transport_config = config
+        self._services = {}
+        self._channel = None
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def get_service(self, name, **kwargs):
+        if kwargs:
+            return self._client.get_service(name, **kwargs)
+        if name not in self._services:
+            self._services[name] = self._create_service(name)
+        return self._services[name]
+
+    def _create_service(self, name):
+        # GoogleAdsClient has no hook for channel options or an existing
+        # channel, so its channel factory is swapped out just for this call.
+        # The library's own channel options (message size limits, proxy,
+        # single-threaded streaming) are kept, and it still wraps the channel
+        # with its own interceptors.
+        from google.api_core import grpc_helpers
+
+        config = self.transport_config
+
+        with _CHANNEL_FACTORY_LOCK:
+            create_channel = grpc_helpers.create_channel
+
+            def create_configured_channel(*args, **kwargs):
+                kwargs["options"] = channel_options(config, kwargs.get("options") or ())
+                if not config.share_channel:
+                    return create_channel(*args, **kwargs)
+                if self._channel is None:
+                    self._channel = create_channel(*args, **kwargs)
+                return self._channel
+
+            grpc_helpers.create_channel = create_configured_channel
+            try:
+                return self._client.get_service(
+                    name, interceptors=[TransportInterceptor(config)]
+                )
+            finally:
+                grpc_helpers.create_channel = create_channel
+
+    def close(self):
+        """Close the shared channel, or every service's channel."""
+        if self._channel is not None:
+            self._channel.close()
+        else:
+            for service in self._services.values():
+                service.transport.close()
+        self._channel = None
+        self._services = {}
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+_STANDIN_SERVICE = "standin.AssetService"
+_STANDIN_METHOD = f"/{_STANDIN_SERVICE}/MutateAssets"
+
+
+class _ByteCounter:
+    """TCP relay in front of the stand-in server that counts bytes on the wire."""
+
+    def __init__(self, target_port):
+        self.sent = 0
+        self.received = 0
+        self._lock = threading.Lock()
+        self._target_port = target_port
+        self._listener = socket.socket()
+        self._listener.bind(("127.0.0.1", 0))
+        self._listener.listen()
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def reset(self):
+        with self._lock:
+            self.sent = self.received = 0
+
+    def _accept(self):
+        while True:
+            try:
+                downstream, _ = self._listener.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(("127.0.0.1", self._target_port))
+            threading.Thread(
+                target=self._pipe, args=(downstream, upstream, "sent"), daemon=True
+            ).start()
+            threading.Thread(
+                target=self._pipe, args=(upstream, downstream, "received"), daemon=True
+            ).start()
+
+    def _pipe(self, source, destination, counter):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                with self._lock:
+                    setattr(self, counter, getattr(self, counter) + len(data))
+                destination.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, destination):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def close(self):
+        self._listener.close()
+
+
+def _start_standin_server():
+    """Local gRPC server that accepts MutateAssets-shaped calls with raw bytes."""
+    handler = grpc.method_handlers_generic_handler(
+        _STANDIN_SERVICE,
+        {
+            "MutateAssets": grpc.unary_unary_rpc_method_handler(
+                lambda request, context: b"customers/0/assets/%d" % len(request)
+            ),
+        },
+    )
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, port
+
+
+def _run_benchmark_case(config, port, payload, calls):
+    """Make `calls` requests with one config. Returns per-call latencies in seconds."""
+    options = channel_options(config)
+    interceptor = TransportInterceptor(config)
+    address = f"127.0.0.1:{port}"
+
+    def open_channel():
+        channel = grpc.intercept_channel(
+            grpc.insecure_channel(address, options=options), interceptor
+        )
+        return channel, channel.unary_unary(_STANDIN_METHOD)
+
+    shared = open_channel() if config.share_channel else None
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        channel, mutate_assets = shared or open_channel()
+        mutate_assets(payload)
+        if shared is None:
+            channel.close()
+        latencies.append(time.perf_counter() - start)
+    if shared is not None:
+        shared[0].close()
+    return latencies
+
+
+def benchmark(image_path=None, calls=20):
+    """Compare bytes on the wire and latency for each transport option."""
+    if image_path:
+        with open(image_path, "rb") as image_file:
+            payload = image_file.read()
+        source = os.path.basename(image_path)
+    else:
+        # Half random (like compressed image data), half repetitive.
+        payload = os.urandom(256 * 1024) + bytes(256 * 1024)
+        source = "synthetic 512 KB payload"
+
+    cases = [
+        ("new channel per call (library default)", LIBRARY_TRANSPORT),
+        ("shared channel", LIBRARY_TRANSPORT._replace(share_channel=True)),
+        ("shared channel + keepalive", DEFAULT_TRANSPORT._replace(timeout=None)),
+        ("shared + keepalive + deadline", DEFAULT_TRANSPORT),
+        ("shared + keepalive + deadline + gzip", DEFAULT_TRANSPORT._replace(
+            compression="gzip", compression_threshold=0
+        )),
+    ]
+
+    server, server_port = _start_standin_server()
+    counter = _ByteCounter(server_port)
+
+    print("=" * 70)
+    print("GRPC TRANSPORT BENCHMARK")
+    print("=" * 70)
+    print(f"Payload: {source} ({len(payload) / 1024:.0f} KB), {calls} calls per option")
+    print("=" * 70)
+    print(f"{'Option':<40}{'KB sent':>10}{'avg ms':>10}{'p95 ms':>10}")
+
+    try:
+        # Warm up the server so the first option isn't charged for it.
+        _run_benchmark_case(LIBRARY_TRANSPORT, counter.port, payload, 1)
+        for label, config in cases:
+            counter.reset()
+            latencies = sorted(_run_benchmark_case(config, counter.port, payload, calls))
+            # Give the relay a moment to flush the last frames before reading.
+            time.sleep(0.1)
+            average = sum(latencies) / len(latencies) * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            print(f"{label:<40}{counter.sent / 1024:>10.0f}{average:>10.1f}{p95:>10.1f}")
+    finally:
+        counter.close()
+        server.stop(None)
+
+    print("=" * 70)
+    return 0
+
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != "--benchmark":
+        print("Usage: python grpc_transport.py --benchmark [path/to/image.jpg] [calls]")
+        return 2
+
+    image_path = argv[1] if len(argv) > 1 else None
+    calls = int(argv[2]) if len(argv) > 2 else 20
+    return benchmark(image_path, calls)
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,6 +1,8 @@
 import streamlit as st
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
+from ad_copy_lint import errors_only, format_violations, lint_creative
+from grpc_transport import TransportClient, TransportConfig
 import tempfile
 import os
 from io import BytesIO
@@ -79,13 +81,28 @@ with st.sidebar:
         client_secret = st.text_input("Client Secret", type="password")
         refresh_token = st.text_input("Refresh Token", type="password")
     
+    st.markdown("---")
+    with st.expander("⚙️ gRPC Transport"):
+        share_channel = st.checkbox("Share one channel across services", value=True)
+        keepalive_time_ms = st.number_input("Keepalive interval (ms, 0 = off)", min_value=0, value=60000, step=10000)
+        request_timeout = st.number_input("Per-call deadline (seconds)", min_value=1, value=120)
+        use_gzip = st.checkbox("Gzip requests of 64 KB or more", value=False,
+                               help="JPEG/PNG barely compress; run `python grpc_transport.py --benchmark` to compare")
+    transport = TransportConfig(
+        share_channel=share_channel,
+        keepalive_time_ms=int(keepalive_time_ms),
+        timeout=float(request_timeout),
+        compression="gzip" if use_gzip else None
+    )
+    
     st.markdown("---")
     st.markdown("### 📚 Resources")
     st.markdown("- [Get API Credentials](https://developers.google.com/google-ads/api/docs/first-call/overview)")
     st.markdown("- [GitHub Repo](https://github.com/nstanley-ui/google_ads_api_checker)")
 
 
-def initialize_client(developer_token, client_id, client_secret, refresh_token, login_customer_id):
+def initialize_client(developer_token, client_id, client_secret, refresh_token, login_customer_id,
+                      transport=None):
     """Initialize Google Ads API client"""
     try:
         credentials = {
@@ -99,7 +116,7 @@ def initialize_client(developer_token, client_id, client_secret, refresh_token,
         
         # Create client from dict
         client = GoogleAdsClient.load_from_dict(credentials)
-        return client, None
+        return TransportClient(client, transport or TransportConfig()), None
     except Exception as e:
         return None, str(e)
 
@@ -179,10 +196,34 @@ def upload_image_asset(client, customer_id, image_data, image_name):
         return None, None, error_msg
 
 
+def lint_ad_copy(headline_1, headline_2, headline_3, description_1, description_2,
+                 business_name, final_url):
+    """Lint ad copy offline, returns (error message or None, warning message or None)"""
+    violations = lint_creative({
+        "headline_1": headline_1,
+        "headline_2": headline_2,
+        "headline_3": headline_3,
+        "description_1": description_1,
+        "description_2": description_2,
+        "business_name": business_name,
+        "final_url": final_url,
+    })
+    if errors_only(violations):
+        return format_violations(violations, show_index=False), None
+    if violations:
+        return None, format_violations(violations, show_index=False)
+    return None, None
+
+
 def create_paused_ad(client, customer_id, ad_group_resource_name, image_asset_resource_name,
                      headline_1, headline_2, headline_3, description_1, description_2,
                      business_name, final_url):
     """Create a paused responsive display ad"""
+    error_msg, _ = lint_ad_copy(headline_1, headline_2, headline_3, description_1, description_2,
+                                business_name, final_url)
+    if error_msg:
+        return None, error_msg
+    
     ad_group_ad_service = client.get_service("AdGroupAdService")
     
     try:
@@ -282,6 +323,13 @@ if st.button("🚀 Validate Creative", type="primary", use_container_width=True)
     if not customer_id or not campaign_id:
         errors.append("❌ Please provide Customer ID and Campaign ID")
     
+    lint_error, lint_warning = lint_ad_copy(headline_1, headline_2, headline_3, description_1,
+                                            description_2, business_name, final_url)
+    if lint_error:
+        errors.append(f"❌ Ad copy failed lint:\n{lint_error}")
+    elif lint_warning:
+        st.warning(f"⚠️ Ad copy lint warnings:\n{lint_warning}")
+    
     if errors:
         for error in errors:
             st.error(error)
@@ -289,6 +337,7 @@ if st.button("🚀 Validate Creative", type="primary", use_container_width=True)
         # Progress bar
         progress_bar = st.progress(0)
         status_text = st.empty()
+        client = None
         
         try:
             # Step 1: Initialize client
@@ -301,11 +350,12 @@ if st.button("🚀 Validate Creative", type="primary", use_container_width=True)
                     st.secrets["google_ads"]["client_id"],
                     st.secrets["google_ads"]["client_secret"],
                     st.secrets["google_ads"]["refresh_token"],
-                    customer_id
+                    customer_id,
+                    transport
                 )
             else:
                 client, error = initialize_client(
-                    developer_token, client_id, client_secret, refresh_token, customer_id
+                    developer_token, client_id, client_secret, refresh_token, customer_id, transport
                 )
             
             if error:
@@ -390,6 +440,11 @@ if st.button("🚀 Validate Creative", type="primary", use_container_width=True)
             import traceback
             with st.expander("📋 Error Details"):
                 st.code(traceback.format_exc())
+        finally:
+            # Each run gets its own client; close its channel, including
+            # when st.stop() ends the run early.
+            if client is not None:
+                client.close()
 
 # Footer
 st.markdown("---")